@@ -3,6 +3,14 @@ from mcp.server.fastmcp import FastMCP
 
 mcp = FastMCP("Demo Server")
 
+# Greeting styles, built once at import time
+_STYLES = {
+    "friendly": "Write a warm, friendly greeting",
+    "formal":   "Write a formal, professional greeting",
+    "casual":   "Write a casual, relaxed greeting"
+}
+_DEFAULT_STYLE = _STYLES["friendly"]
+
 # --- Tool: add two numbers ---
 @mcp.tool()
 def add(a: int, b: int) -> int:
@@ -19,12 +27,7 @@ def health() -> str:
 @mcp.prompt()
 def greet_user(name: str, style: str = "friendly") -> str:
     """Create a greeting template the model can fill in/use."""
-    styles = {
-        "friendly": "Write a warm, friendly greeting",
-        "formal":   "Write a formal, professional greeting",
-        "casual":   "Write a casual, relaxed greeting"
-    }
-    return f"""{styles.get(style, styles["friendly"])} for someone named {name}.
+    return f"""{_STYLES.get(style, _DEFAULT_STYLE)} for someone named {name}.
 Keep it concise, and include a short well-wish."""
 
 if __name__ == "__main__":
@@ -5,45 +5,172 @@ Demonstrates combining network interception with runtime manipulation
 Target: dawn.com (news website)
 """
 
-import json
+import asyncio
+import atexit
+import functools
+import queue
+import signal
 import sqlite3
 import threading
 import time
 from datetime import datetime
 from typing import Dict, Any
 
-import requests
+import httpx
 from mitmproxy import http
 from mitmproxy.tools.dump import DumpMaster
 from mitmproxy.options import Options
+from selectolax.lexbor import LexborHTMLParser
 import frida
+import orjson
+import zstandard as zstd
 import sys
 
 
+# Rows are written in batches: a flush happens once this many rows are queued,
+# or every FLUSH_INTERVAL seconds, whichever comes first.
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 1.0
+
+# Tags searched for article titles, in order of preference
+TITLE_TAGS = ("title", "h1", "h2")
+
+# INSERT statements are kept as constants so sqlite3's statement cache
+# prepares each one once and reuses it for every batch.
+_SQL_TRAFFIC = '''
+    INSERT INTO network_traffic 
+    (timestamp, method, url, status_code, request_headers, response_headers, request_body, response_body)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+_SQL_HOOK = '''
+    INSERT INTO frida_hooks 
+    (timestamp, hook_type, function_name, parameters, return_value, additional_data)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+# Articles are written with multi-row VALUES statements of up to this many rows
+# (4 parameters per row keeps this far below SQLite's 999 parameter limit).
+ARTICLE_ROWS_PER_INSERT = 64
+
+# Maximum number of Frida payloads handed to the collector in one call
+HOOK_DRAIN_BATCH = 256
+
+# show_statistics re-reads authoritative row counts every this many calls and
+# relies on the collector's in-memory counters in between
+STATS_REFRESH_EVERY = 6
+
+# test_dawn_com_access streams the page and stops after this many bytes
+TEST_SCAN_LIMIT = 256 * 1024
+
+
+@functools.lru_cache(maxsize=None)
+def _sql_articles(rows: int) -> str:
+    """Build a multi-row INSERT statement for scraped_articles"""
+    return (
+        "INSERT INTO scraped_articles (timestamp, title, url, extraction_method) VALUES "
+        + ",".join(["(?, ?, ?, ?)"] * rows)
+    )
+
+
+# Response bodies are stored zstd-compressed; use decompress_body() to read them
+_ZC = zstd.ZstdCompressor(level=3)
+_ZD = zstd.ZstdDecompressor()
+
+
+def decompress_body(blob: bytes) -> bytes:
+    """Return the raw response body stored in network_traffic.response_body"""
+    return _ZD.decompress(blob) if blob else blob
+
+
+def _to_json(obj) -> bytes:
+    """Serialize a dict to JSON bytes for a BLOB column, or None if empty"""
+    # OPT_NON_STR_KEYS accepts int keys and the like, as json.dumps does
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS) if obj else None
+
+
+def _encode_traffic(rows):
+    """Encode queued traffic rows for insertion, dropping any that fail to encode"""
+    encoded = []
+    for ts, method, url, status, req_headers, resp_headers, req_body, resp_body in rows:
+        try:
+            encoded.append((
+                ts, method, url, status, _to_json(req_headers), _to_json(resp_headers),
+                req_body, _ZC.compress(resp_body) if resp_body else None
+            ))
+        except Exception as e:
+            print(f"[DB] Dropping traffic row for {url}: {e}")
+    return encoded
+
+
+def _encode_hooks(rows):
+    """Encode queued Frida hook rows for insertion, dropping any that fail to encode"""
+    encoded = []
+    for ts, hook_type, function_name, parameters, return_value, additional_data in rows:
+        try:
+            encoded.append((
+                ts, hook_type, function_name, _to_json(parameters), return_value, _to_json(additional_data)
+            ))
+        except Exception as e:
+            print(f"[DB] Dropping hook row for {function_name}: {e}")
+    return encoded
+
+
 class DataCollector:
     """Handles data collection and storage from both MITM and Frida"""
     
     def __init__(self, db_path: str = "mitm_frida_data.db"):
         self.db_path = db_path
+        self._lock = threading.Lock()
+        self._pending_traffic = []
+        self._pending_hooks = []
+        self._pending_articles = []
+        
+        # (epoch second, ISO string) of the last timestamp handed out
+        self._ts = (-1, "")
+        
+        # Rows written so far, maintained by the batch writer
+        self.traffic_count = self.hook_count = self.article_count = 0
+        
+        # One long-lived connection shared by all writers; access is
+        # serialized with _write_lock instead of reconnecting per batch.
+        self._write_lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
         self.init_database()
         
+        # Background flusher so low-traffic periods still persist rows
+        self._wakeup = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+        
     def init_database(self):
         """Initialize SQLite database for storing captured data"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
+        
+        # Tune the connection before any table exists: page_size only takes
+        # effect on an empty database and cannot change once WAL is enabled.
+        cursor.executescript('''
+            PRAGMA page_size=8192;
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA locking_mode=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-65536;
+            PRAGMA mmap_size=268435456;
+        ''')
         
         # Network traffic table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS network_traffic (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY,
                 timestamp TEXT,
                 method TEXT,
                 url TEXT,
                 status_code INTEGER,
-                request_headers TEXT,
-                response_headers TEXT,
+                request_headers BLOB,
+                response_headers BLOB,
                 request_body TEXT,
-                response_body TEXT,
+                response_body BLOB,
                 source TEXT DEFAULT 'mitm'
             )
         ''')
@@ -51,20 +178,20 @@ class DataCollector:
         # Frida hooks data table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS frida_hooks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY,
                 timestamp TEXT,
                 hook_type TEXT,
                 function_name TEXT,
-                parameters TEXT,
+                parameters BLOB,
                 return_value TEXT,
-                additional_data TEXT
+                additional_data BLOB
             )
         ''')
         
         # Scraped news articles table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS scraped_articles (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY,
                 timestamp TEXT,
                 title TEXT,
                 url TEXT,
@@ -74,55 +201,149 @@ class DataCollector:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+    def _now(self) -> str:
+        """Current time as an ISO string, formatted at most once per second"""
+        second = int(time.time())
+        cached_second, cached_str = self._ts
+        if second != cached_second:
+            cached_str = datetime.fromtimestamp(second).isoformat()
+            self._ts = (second, cached_str)
+        return cached_str
         
     def log_network_traffic(self, method: str, url: str, status_code: int = None, 
                           request_headers: Dict = None, response_headers: Dict = None,
-                          request_body: str = None, response_body: str = None):
-        """Log network traffic to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO network_traffic 
-            (timestamp, method, url, status_code, request_headers, response_headers, request_body, response_body)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            datetime.now().isoformat(),
+                          request_body: str = None, response_body: bytes = None):
+        """Queue network traffic for the next batched database write"""
+        row = (
+            self._now(),
             method,
             url,
             status_code,
-            json.dumps(request_headers) if request_headers else None,
-            json.dumps(response_headers) if response_headers else None,
+            request_headers,
+            response_headers,
             request_body,
             response_body
-        ))
-        
-        conn.commit()
-        conn.close()
+        )
+        with self._lock:
+            self._pending_traffic.append(row)
+            if len(self._pending_traffic) >= BATCH_SIZE:
+                self._wakeup.set()
         
     def log_frida_hook(self, hook_type: str, function_name: str, parameters: Dict = None,
                       return_value: Any = None, additional_data: Dict = None):
-        """Log Frida hook data to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO frida_hooks 
-            (timestamp, hook_type, function_name, parameters, return_value, additional_data)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            datetime.now().isoformat(),
+        """Queue Frida hook data for the next batched database write"""
+        row = (
+            self._now(),
             hook_type,
             function_name,
-            json.dumps(parameters) if parameters else None,
+            parameters,
             str(return_value) if return_value else None,
-            json.dumps(additional_data) if additional_data else None
-        ))
+            additional_data
+        )
+        with self._lock:
+            self._pending_hooks.append(row)
+            if len(self._pending_hooks) >= BATCH_SIZE:
+                self._wakeup.set()
+                
+    def bulk_log_frida_hook(self, payloads):
+        """Queue a batch of raw Frida message payloads with a single lock acquisition"""
+        timestamp = self._now()
+        rows = [
+            (
+                timestamp,
+                payload['type'],
+                payload.get('method', 'unknown'),
+                {'url': payload.get('url', '')},
+                None,
+                payload
+            )
+            for payload in payloads
+        ]
+        with self._lock:
+            self._pending_hooks.extend(rows)
+            if len(self._pending_hooks) >= BATCH_SIZE:
+                self._wakeup.set()
+                
+    def log_article(self, title: str, url: str, extraction_method: str):
+        """Queue an extracted article for the next batched database write"""
+        row = (self._now(), title, url, extraction_method)
+        with self._lock:
+            self._pending_articles.append(row)
+            if len(self._pending_articles) >= BATCH_SIZE:
+                self._wakeup.set()
+                
+    def flush(self):
+        """Write all queued rows to the database in a single transaction"""
+        with self._lock:
+            traffic, self._pending_traffic = self._pending_traffic, []
+            hooks, self._pending_hooks = self._pending_hooks, []
+            articles, self._pending_articles = self._pending_articles, []
+            
+        if not (traffic or hooks or articles):
+            return
+            
+        with self._write_lock:
+            self._write_batch(traffic, hooks, articles)
+            
+    def _write_batch(self, traffic, hooks, articles):
+        """Insert one batch of queued rows inside a single transaction"""
+        # JSON encoding and body compression happen here on the flushing
+        # thread, so proxy and Frida callbacks only pay for a list append.
+        # A row that can't be encoded is dropped on its own, not with the batch.
+        traffic = _encode_traffic(traffic)
+        hooks = _encode_hooks(hooks)
+        
+        cursor = self.conn.cursor()
         
-        conn.commit()
-        conn.close()
+        cursor.execute("BEGIN")
+        try:
+            if traffic:
+                cursor.executemany(_SQL_TRAFFIC, traffic)
+            if hooks:
+                cursor.executemany(_SQL_HOOK, hooks)
+            for start in range(0, len(articles), ARTICLE_ROWS_PER_INSERT):
+                chunk = articles[start:start + ARTICLE_ROWS_PER_INSERT]
+                cursor.execute(_sql_articles(len(chunk)), [value for row in chunk for value in row])
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+            
+        self.traffic_count += len(traffic)
+        self.hook_count += len(hooks)
+        self.article_count += len(articles)
+        
+    def refresh_counts(self):
+        """Reload the row counters from the database tables"""
+        with self._write_lock:
+            cursor = self.conn.cursor()
+            self.traffic_count = cursor.execute("SELECT COUNT(*) FROM network_traffic").fetchone()[0]
+            self.hook_count = cursor.execute("SELECT COUNT(*) FROM frida_hooks").fetchone()[0]
+            self.article_count = cursor.execute("SELECT COUNT(*) FROM scraped_articles").fetchone()[0]
+            
+    def recent_articles(self, limit: int = 3):
+        """Return (title, url) of the most recently stored articles"""
+        with self._write_lock:
+            return self.conn.execute(
+                "SELECT title, url FROM scraped_articles ORDER BY id DESC LIMIT ?", (limit,)
+            ).fetchall()
+            
+    def close(self):
+        """Flush any queued rows and close the database connection"""
+        self.flush()
+        with self._write_lock:
+            self.conn.close()
+            
+    def _flush_periodically(self):
+        """Flush queued rows every FLUSH_INTERVAL seconds or when a batch fills up"""
+        while True:
+            self._wakeup.wait(FLUSH_INTERVAL)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # Keep the flusher alive; later batches can still be written
+                print(f"[DB] Failed to flush batch: {e}")
 
 
 class MitmAddon:
@@ -131,18 +352,27 @@ class MitmAddon:
     def __init__(self, collector: DataCollector):
         self.collector = collector
         self.target_domains = ['dawn.com', 'www.dawn.com']
+        # Hosts are matched by suffix in a single C-level str.endswith call
+        self._suffixes = tuple(self.target_domains)
+        
+        # HTML parsing runs on a worker thread so the proxy event loop only
+        # pays for an enqueue; pages are dropped if the worker falls behind.
+        self.extract_q = queue.Queue(maxsize=1024)
+        self._extract_thread = threading.Thread(target=self._extract_worker, daemon=True)
+        self._extract_thread.start()
         
     def request(self, flow: http.HTTPFlow) -> None:
         """Intercept and log requests"""
-        if any(domain in flow.request.pretty_host for domain in self.target_domains):
-            print(f"[MITM] Intercepted request: {flow.request.method} {flow.request.pretty_url}")
+        if flow.request.pretty_host.endswith(self._suffixes):
+            url = flow.request.pretty_url
+            print(f"[MITM] Intercepted request: {flow.request.method} {url}")
             
             # Log request
             self.collector.log_network_traffic(
                 method=flow.request.method,
-                url=flow.request.pretty_url,
+                url=url,
                 request_headers=dict(flow.request.headers),
-                request_body=flow.request.text if flow.request.text else None
+                request_body=flow.request.text if flow.request.raw_content else None
             )
             
             # Add custom headers to identify our traffic
@@ -150,63 +380,62 @@ class MitmAddon:
             
     def response(self, flow: http.HTTPFlow) -> None:
         """Intercept and log responses"""
-        if any(domain in flow.request.pretty_host for domain in self.target_domains):
-            print(f"[MITM] Intercepted response: {flow.response.status_code} for {flow.request.pretty_url}")
+        if flow.request.pretty_host.endswith(self._suffixes):
+            url = flow.request.pretty_url
+            print(f"[MITM] Intercepted response: {flow.response.status_code} for {url}")
+            
+            # Only decompress bodies that are stored or parsed; images, video
+            # and other binary responses are logged with status and headers only.
+            # The decoded bytes are shared between logging and extraction.
+            content_type = flow.response.headers.get('content-type', '')
+            body = flow.response.content if content_type.startswith('text/') else None
             
             # Log response
             self.collector.log_network_traffic(
                 method=flow.request.method,
-                url=flow.request.pretty_url,
+                url=url,
                 status_code=flow.response.status_code,
                 request_headers=dict(flow.request.headers),
                 response_headers=dict(flow.response.headers),
-                request_body=flow.request.text if flow.request.text else None,
-                response_body=flow.response.text if flow.response.text else None
+                request_body=flow.request.text if flow.request.raw_content else None,
+                response_body=body
             )
             
             # Extract news articles from HTML responses
-            if 'text/html' in flow.response.headers.get('content-type', ''):
-                self.extract_articles_from_html(flow.response.text, flow.request.pretty_url)
+            if body and 'text/html' in content_type:
+                try:
+                    self.extract_q.put_nowait((body, url))
+                except queue.Full:
+                    print(f"[MITM] Extraction queue full, skipping {url}")
+                    
+    def _extract_worker(self):
+        """Pull queued HTML pages and extract articles off the proxy thread"""
+        while True:
+            html_content, url = self.extract_q.get()
+            try:
+                self.extract_articles_from_html(html_content, url)
+            except Exception as e:
+                print(f"[MITM] Article extraction failed for {url}: {e}")
                 
-    def extract_articles_from_html(self, html_content: str, url: str):
-        """Simple HTML parsing to extract article titles and content"""
-        # This is a basic implementation - in production you'd use BeautifulSoup
+    def extract_articles_from_html(self, html_content: bytes, url: str):
+        """Extract article titles from an HTML page using selectolax (lexbor)"""
         if not html_content:
             return
             
-        # Look for common patterns in dawn.com HTML structure
-        import re
-        
-        # Extract article titles
-        title_patterns = [
-            r'<title>(.*?)</title>',
-            r'<h1[^>]*>(.*?)</h1>',
-            r'<h2[^>]*>(.*?)</h2>'
-        ]
+        # selectolax parses the raw response bytes in C, no Python-side decode
+        tree = LexborHTMLParser(html_content)
         
-        for pattern in title_patterns:
-            titles = re.findall(pattern, html_content, re.IGNORECASE | re.DOTALL)
-            for title in titles:
-                # Clean HTML tags
-                clean_title = re.sub(r'<[^>]+>', '', title).strip()
+        # Take the first good title for each of <title>, <h1> and <h2>
+        for tag in TITLE_TAGS:
+            for node in tree.css(tag):
+                clean_title = node.text().strip()
                 if clean_title and len(clean_title) > 10:
-                    conn = sqlite3.connect(self.collector.db_path)
-                    cursor = conn.cursor()
-                    
-                    cursor.execute('''
-                        INSERT INTO scraped_articles 
-                        (timestamp, title, url, extraction_method)
-                        VALUES (?, ?, ?, ?)
-                    ''', (
-                        datetime.now().isoformat(),
+                    self.collector.log_article(
                         clean_title[:500],  # Limit title length
                         url,
                         'mitm_html_parsing'
-                    ))
-                    
-                    conn.commit()
-                    conn.close()
-                    break  # Only take the first good title
+                    )
+                    break
 
 
 class FridaHooker:
@@ -217,6 +446,12 @@ class FridaHooker:
         self.session = None
         self.script = None
         
+        # on_message runs on Frida's IPC thread, so it only enqueues payloads;
+        # a writer thread drains them into the collector in batches.
+        self.hook_q = queue.SimpleQueue()
+        self._drain_thread = threading.Thread(target=self._drain, daemon=True)
+        self._drain_thread.start()
+        
     def get_frida_script(self) -> str:
         """JavaScript code for Frida hooks"""
         return '''
@@ -330,19 +565,36 @@ class FridaHooker:
     def on_message(self, message, data):
         """Handle messages from Frida script"""
         if message['type'] == 'send':
-            payload = message['payload']
-            print(f"[FRIDA] Received: {payload['type']} - {payload}")
-            
-            # Log to database
-            self.collector.log_frida_hook(
-                hook_type=payload['type'],
-                function_name=payload.get('method', 'unknown'),
-                parameters={'url': payload.get('url', '')},
-                additional_data=payload
-            )
+            self.hook_q.put(message['payload'])
         elif message['type'] == 'error':
             print(f"[FRIDA] Error: {message['stack']}")
             
+    def _drain(self):
+        """Log queued Frida payloads to the database in batches"""
+        while True:
+            payloads = [self.hook_q.get()]
+            while len(payloads) < HOOK_DRAIN_BATCH:
+                try:
+                    payloads.append(self.hook_q.get_nowait())
+                except queue.Empty:
+                    break
+                    
+            try:
+                # send() accepts any value, but only typed dicts can be logged
+                valid = []
+                for payload in payloads:
+                    if isinstance(payload, dict) and 'type' in payload:
+                        print(f"[FRIDA] Received: {payload['type']} - {payload}")
+                        valid.append(payload)
+                    else:
+                        print(f"[FRIDA] Ignoring malformed payload: {payload!r}")
+                        
+                # Log to database
+                if valid:
+                    self.collector.bulk_log_frida_hook(valid)
+            except Exception as e:
+                print(f"[FRIDA] Failed to log hook batch: {e}")
+            
     def attach_to_process(self, process_name: str = None):
         """Attach Frida to Android process"""
         try:
@@ -395,6 +647,7 @@ class MitmFridaAgent:
         self.mitm_addon = MitmAddon(self.collector)
         self.frida_hooker = FridaHooker(self.collector)
         self.mitm_thread = None
+        self._stats_calls = 0
         
     def start_mitm_proxy(self, port: int = 8080):
         """Start MITM proxy in a separate thread"""
@@ -427,65 +680,65 @@ class MitmFridaAgent:
         """Test accessing dawn.com through our proxy"""
         print("\n[TEST] Testing direct access to dawn.com...")
         
-        # Configure requests to use our proxy
-        proxies = {
-            'http': 'http://localhost:8080',
-            'https': 'http://localhost:8080'
-        }
-        
         try:
-            # Test HTTP request
-            response = requests.get('https://www.dawn.com', 
-                                  proxies=proxies, 
-                                  verify=False,  # Ignore SSL for testing
-                                  timeout=10,
-                                  headers={'User-Agent': 'MCP-Learn-Agent/1.0'})
-            
-            print(f"[TEST] Response code: {response.status_code}")
-            print(f"[TEST] Response size: {len(response.text)} bytes")
-            
-            # Extract some basic info
-            if 'dawn' in response.text.lower():
-                print("[TEST]  Successfully accessed dawn.com content")
-            else:
-                print("[TEST] � Unexpected content received")
-                
+            asyncio.run(self._stream_dawn_com())
         except Exception as e:
             print(f"[TEST] Failed to access dawn.com: {e}")
             
+    async def _stream_dawn_com(self):
+        """Stream dawn.com through the proxy, reading only as much as needed"""
+        async with httpx.AsyncClient(proxy='http://localhost:8080',
+                                     verify=False,  # Ignore SSL for testing
+                                     timeout=10,
+                                     headers={'User-Agent': 'MCP-Learn-Agent/1.0'}) as client:
+            async with client.stream('GET', 'https://www.dawn.com') as response:
+                print(f"[TEST] Response code: {response.status_code}")
+                
+                # Look for the site name in the first TEST_SCAN_LIMIT bytes,
+                # carrying a short tail so a match split across chunks is found
+                scanned = 0
+                tail = b''
+                found = False
+                async for chunk in response.aiter_bytes(65536):
+                    scanned += len(chunk)
+                    window = tail + chunk.lower()
+                    if b'dawn' in window:
+                        found = True
+                        break
+                    if scanned >= TEST_SCAN_LIMIT:
+                        break
+                    tail = window[-3:]
+                    
+                print(f"[TEST] Bytes scanned: {scanned}")
+                
+                # Extract some basic info
+                if found:
+                    print("[TEST]  Successfully accessed dawn.com content")
+                else:
+                    print("[TEST] � Unexpected content received")
+                    
     def show_statistics(self):
         """Show collected data statistics"""
-        conn = sqlite3.connect(self.collector.db_path)
-        cursor = conn.cursor()
-        
-        # Network traffic stats
-        cursor.execute("SELECT COUNT(*) FROM network_traffic")
-        traffic_count = cursor.fetchone()[0]
-        
-        # Frida hooks stats  
-        cursor.execute("SELECT COUNT(*) FROM frida_hooks")
-        hooks_count = cursor.fetchone()[0]
+        self.collector.flush()
         
-        # Scraped articles stats
-        cursor.execute("SELECT COUNT(*) FROM scraped_articles")
-        articles_count = cursor.fetchone()[0]
+        # Full-table counts only every STATS_REFRESH_EVERY calls
+        if self._stats_calls % STATS_REFRESH_EVERY == 0:
+            self.collector.refresh_counts()
+        self._stats_calls += 1
         
         print(f"\n=== STATISTICS ===")
-        print(f"Network requests captured: {traffic_count}")
-        print(f"Frida hooks triggered: {hooks_count}")
-        print(f"Articles extracted: {articles_count}")
+        print(f"Network requests captured: {self.collector.traffic_count}")
+        print(f"Frida hooks triggered: {self.collector.hook_count}")
+        print(f"Articles extracted: {self.collector.article_count}")
         
         # Show recent articles
-        cursor.execute("SELECT title, url FROM scraped_articles ORDER BY timestamp DESC LIMIT 3")
-        recent_articles = cursor.fetchall()
+        recent_articles = self.collector.recent_articles(3)
         
         if recent_articles:
             print(f"\nRecent articles:")
             for title, url in recent_articles:
                 print(f"  • {title[:80]}{'...' if len(title) > 80 else ''}")
                 
-        conn.close()
-        
     def run_demo(self):
         """Run the complete demo"""
         print("🚀 Starting MITM + Frida Integration Demo")
@@ -514,17 +767,39 @@ class MitmFridaAgent:
         print("   • Watch the real-time logs above")
         print("   • Press Ctrl+C to stop and see statistics")
         
-        try:
-            # Keep running and show periodic stats
-            while True:
-                time.sleep(10)
-                print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Agent is monitoring...")
-                self.show_statistics()
-                
-        except KeyboardInterrupt:
-            print("\n\n🛑 Stopping demo...")
+        # Keep running and show periodic stats
+        self.wait_for_interrupt(stats_interval=10)
+        
+        print("\n\n🛑 Stopping demo...")
+        self.show_statistics()
+        print("\n Demo completed! Check mitm_frida_data.db for all captured data.")
+        
+    def wait_for_interrupt(self, stats_interval: float = None):
+        """Sleep until Ctrl+C, optionally showing statistics every stats_interval seconds"""
+        stop = threading.Event()
+        signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+        
+        timer = None
+        
+        def report():
+            print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Agent is monitoring...")
             self.show_statistics()
-            print("\n Demo completed! Check mitm_frida_data.db for all captured data.")
+            schedule()
+            
+        def schedule():
+            nonlocal timer
+            timer = threading.Timer(stats_interval, report)
+            timer.daemon = True
+            timer.start()
+            
+        if stats_interval:
+            schedule()
+            
+        # Blocks in the kernel until the SIGINT handler sets the event
+        stop.wait()
+        
+        if timer:
+            timer.cancel()
 
 
 def main():
@@ -539,11 +814,8 @@ def main():
         elif command == "proxy-only":
             print("Starting MITM proxy only...")
             agent.start_mitm_proxy()
-            try:
-                while True:
-                    time.sleep(1)
-            except KeyboardInterrupt:
-                print("Stopping proxy...")
+            agent.wait_for_interrupt()
+            print("Stopping proxy...")
             return
     
     # Run full demo
@@ -5,396 +5,715 @@ Shows actual JSON-RPC communication between client and server.
 This demonstrates the real MCP protocol in action.
 """
 
+import argparse
 import asyncio
+import contextlib
+import functools
+import itertools
 import json
-import os
-from typing import Dict, Any, Optional
+import logging
+import sys
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    # Fall back to the stdlib; json.loads accepts bytes as well
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    _loads = json.loads
+else:
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+
+
+# Raw JSON-RPC traffic is logged here at DEBUG level when a client is verbose
+logger = logging.getLogger(__name__)
+
+# Largest single JSON-RPC line the reader accepts. asyncio's default 64 KiB
+# stream limit makes readline() fail on big resource or prompt responses.
+STREAM_LIMIT = 16 * 1024 * 1024
+
+# Outgoing messages queued within this window are written together, up to
+# _BATCH_MAX messages per write
+_BATCH_WINDOW_S = 0.001
+_BATCH_MAX = 32
+
+# Pre-encoded requests whose only varying field is the id (spliced in with %)
+_TPL_INITIALIZE = (
+    b'{"jsonrpc":"2.0","id":%d,"method":"initialize","params":'
+    b'{"protocolVersion":"2024-11-05",'
+    b'"capabilities":{"tools":{},"resources":{},"prompts":{}},'
+    b'"clientInfo":{"name":"real-mcp-client","version":"1.0.0"}}}'
+)
+_TPL_TOOLS_LIST = b'{"jsonrpc":"2.0","id":%d,"method":"tools/list"}'
+_TPL_RESOURCES_LIST = b'{"jsonrpc":"2.0","id":%d,"method":"resources/list"}'
+_TPL_PROMPTS_LIST = b'{"jsonrpc":"2.0","id":%d,"method":"prompts/list"}'
+
+# Notifications carry no id, so this one is fully constant
+_INITIALIZED_NOTIFICATION = b'{"jsonrpc":"2.0","method":"notifications/initialized"}'
+
+# Payloads used by run_comprehensive_test, built once at import time
+TEST_TOOL_CALLS = (
+    # Test calculator tool
+    ("calculate", {"operation": "add", "a": 25, "b": 17}),
+    # Test text transform
+    ("text_transform", {"text": "MCP Protocol Test", "transformation": "upper"}),
+    # Test counter
+    ("manage_counter", {"action": "increment", "amount": 10}),
+)
+
+TEST_PROMPTS = (
+    # Test code generation prompt
+    ("generate_code", {
+        "language": "javascript",
+        "task": "create a function to validate email addresses",
+        "style": "simple"
+    }),
+)
+
+
+# Icons for every decorated line of output; dropped when stdout is not a
+# terminal (CI logs, redirects) so captured output stays plain and greppable
+_ICON_CHARS = {
+    "send": "📤",
+    "recv": "📥",
+    "ok": "✅",
+    "fail": "❌",
+    "tool": "🔧",
+    "resource": "📄",
+    "prompt": "✨",
+    "start": "🚀",
+    "connect": "🔌",
+    "list": "📋",
+    "resources": "📚",
+    "prompts": "💭",
+    "test": "🧪",
+    "done": "🎉",
+    "cleanup": "🔄",
+    "location": "📍",
+}
+if sys.stdout.isatty():
+    ICONS = {key: f"{icon} " for key, icon in _ICON_CHARS.items()}
+else:
+    ICONS = dict.fromkeys(_ICON_CHARS, "")
+
+# Banner rule shared by every section of the output
+_SEP = "=" * 60
+
+
+def _print_section(title: str):
+    """Print a section banner with a single write."""
+    print(f"\n{_SEP}\n{title}\n{_SEP}")
 
 
 class RealMCPClient:
     """A real MCP client that communicates via JSON-RPC over stdio."""
     
-    def __init__(self, server_script_path: str):
+    # Envelope shared by every request; _request() fills in a shallow copy
+    _ENV = {"jsonrpc": "2.0", "id": 0, "method": ""}
+    
+    def __init__(self, server_script_path: str, verbose: bool = False):
         self.server_script_path = server_script_path
+        self.verbose = verbose
         self.process = None
-        self.request_id = 0
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._reader_task: Optional[asyncio.Task] = None
+        self._send_q: Optional[asyncio.Queue] = None
+        self._flush_task: Optional[asyncio.Task] = None
         
     def next_request_id(self) -> int:
         """Generate next request ID."""
-        self.request_id += 1
-        return self.request_id
+        return next(self._ids)
         
     async def start_server(self):
         """Start the MCP server process."""
-        print("🚀 Starting MCP server process...")
+        print(f"{ICONS['start']}Starting MCP server process...")
         print(f"   Command: python3 {self.server_script_path}")
         
         self.process = await asyncio.create_subprocess_exec(
             "python3", self.server_script_path,
             stdin=asyncio.subprocess.PIPE,
             stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+            stderr=asyncio.subprocess.PIPE,
+            limit=STREAM_LIMIT
         )
+        self._reader_task = asyncio.create_task(self._reader_loop())
+        self._send_q = asyncio.Queue()
+        self._flush_task = asyncio.create_task(self._flush_loop())
         
-        print("✅ Server process started!")
+        print(f"{ICONS['ok']}Server process started!")
         
-    async def send_message(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Send a JSON-RPC message to the server and get response."""
-        if not self.process:
-            raise RuntimeError("Server not started")
-            
-        # Convert message to JSON and send
-        json_message = json.dumps(message)
-        print(f"📤 SENDING: {json_message}")
+    def is_alive(self) -> bool:
+        """Whether the server process and its reader are still running."""
+        return (
+            self.process is not None
+            and self.process.returncode is None
+            and self._reader_task is not None
+            and not self._reader_task.done()
+            and self._flush_task is not None
+            and not self._flush_task.done()
+        )
         
-        self.process.stdin.write(json_message.encode() + b'\n')
-        await self.process.stdin.drain()
+    async def __aenter__(self):
+        """Start and initialize a dedicated server for this client."""
+        await self.start_server()
+        if not await self.initialize():
+            await self.cleanup()
+            raise RuntimeError("MCP session initialization failed")
+        return self
         
-        # Read response
-        response_line = await self.process.stdout.readline()
-        if not response_line:
-            return None
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.cleanup()
+        
+    @classmethod
+    @contextlib.asynccontextmanager
+    async def acquire(cls, server_script_path: str, verbose: bool = False):
+        """Check out an initialized client for a server script.
+
+        A live server left in the pool by an earlier caller is reused without
+        starting a new process or repeating the handshake; on exit the client
+        goes back to the pool instead of being terminated.
+        """
+        async with _POOL_LOCK:
+            client = _SERVER_POOL.pop(server_script_path, None)
+            if client is None or not client.is_alive():
+                if client is not None:
+                    await client.cleanup()
+                client = cls(server_script_path, verbose=verbose)
+                await client.__aenter__()
+            client.verbose = verbose
+            
+        try:
+            yield client
+        finally:
+            async with _POOL_LOCK:
+                if client.is_alive() and server_script_path not in _SERVER_POOL:
+                    _SERVER_POOL[server_script_path] = client
+                    client = None
+            if client is not None:
+                await client.cleanup()
+                
+    async def _reader_loop(self):
+        """Read responses from the server and resolve the matching pending request."""
+        try:
+            while True:
+                try:
+                    response_line = await self.process.stdout.readline()
+                except ValueError as e:
+                    # Line longer than STREAM_LIMIT; the stream can't be resynced reliably
+                    print(f"{ICONS['fail']}Response too large: {e}")
+                    break
+                if not response_line:
+                    break
+                    
+                if self.verbose:
+                    logger.debug("%sRECEIVED: %s", ICONS["recv"], response_line.decode().rstrip())
+                
+                # Parse the raw line directly; both parsers accept bytes and ignore
+                # the trailing newline, so no decode/strip copy is needed
+                try:
+                    response = _loads(response_line)
+                except json.JSONDecodeError as e:
+                    print(f"{ICONS['fail']}JSON decode error: {e}")
+                    continue
+                if not isinstance(response, dict):
+                    # No id to match it with, so whatever is waiting won't be answered
+                    print(f"{ICONS['fail']}Unexpected response: {response!r}")
+                    self._fail_pending()
+                    continue
+                    
+                future = self._pending.pop(response.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            # However the loop ended, nothing else will be answered
+            self._fail_pending()
             
-        response_json = response_line.decode().strip()
-        print(f"📥 RECEIVED: {response_json}")
+    def _fail_pending(self):
+        """Resolve every outstanding request with None."""
+        for future in self._pending.values():
+            if not future.done():
+                future.set_result(None)
+        self._pending.clear()
         
+    async def _flush_loop(self):
+        """Write queued messages to the server, coalescing those sent close together."""
+        loop = asyncio.get_running_loop()
         try:
-            response = json.loads(response_json)
-            return response
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON decode error: {e}")
-            return None
+            while True:
+                chunks = [await self._send_q.get(), b'\n']
             
+                # Keep collecting until the window closes or the batch is full
+                deadline = loop.time() + _BATCH_WINDOW_S
+                while len(chunks) < 2 * _BATCH_MAX:
+                    try:
+                        payload = self._send_q.get_nowait()
+                    except asyncio.QueueEmpty:
+                        timeout = deadline - loop.time()
+                        if timeout <= 0:
+                            break
+                        try:
+                            payload = await asyncio.wait_for(self._send_q.get(), timeout)
+                        except asyncio.TimeoutError:
+                            break
+                    chunks.append(payload)
+                    chunks.append(b'\n')
+                
+                # Hand payloads and newlines over separately instead of
+                # concatenating them into new bytes objects
+                self.process.stdin.writelines(chunks)
+                await self.process.stdin.drain()
+        finally:
+            # A dead writer (e.g. the server closed stdin) can't send anything
+            # still queued, so don't leave its callers waiting
+            self._fail_pending()
+            
+    def _register(self, request_id: int) -> asyncio.Future:
+        """Create the future that the reader loop resolves with the response."""
+        future = asyncio.get_running_loop().create_future()
+        if (self._reader_task is None or self._reader_task.done()
+                or self._flush_task is None or self._flush_task.done()):
+            # No reader left to answer it, or no writer left to send it
+            future.set_result(None)
+        else:
+            self._pending[request_id] = future
+        return future
+        
+    async def send_encoded(self, requests: List[Tuple[int, bytes]]) -> List[asyncio.Future]:
+        """Queue already-encoded (id, payload) requests and return futures for their responses.
+
+        Several requests can be in flight at once; the reader loop matches
+        each response to its request by id. The flush loop writes queued
+        requests together, including those queued concurrently by other callers.
+        """
+        if not self.process:
+            raise RuntimeError("Server not started")
+            
+        futures = [self._register(request_id) for request_id, _ in requests]
+        
+        for _, payload in requests:
+            if self.verbose:
+                logger.debug("%sSENDING: %s", ICONS["send"], payload.decode())
+            self._send_q.put_nowait(payload)
+            
+        return futures
+        
+    async def send_many(self, messages: List[Dict[str, Any]]) -> List[asyncio.Future]:
+        """Send several JSON-RPC requests so they go out in a single write.
+
+        All response futures are registered before anything is queued, so
+        no response can arrive ahead of its future.
+        """
+        return await self.send_encoded([(message["id"], _dumps(message)) for message in messages])
+        
+    async def send(self, message: Dict[str, Any]) -> asyncio.Future:
+        """Send a JSON-RPC request and return a future for its response."""
+        futures = await self.send_many([message])
+        return futures[0]
+        
+    async def send_message(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Send a JSON-RPC message to the server and get response."""
+        return await (await self.send(message))
+        
+    async def send_batch(self, messages: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        """Send several independent requests in one write and collect responses by id.
+
+        The stdio transport is newline-delimited, so the batch goes out as
+        consecutive lines rather than a JSON-RPC array; the server answers
+        each line separately and the responses are matched back by id.
+        """
+        return await self._send_encoded_batch([(message["id"], _dumps(message)) for message in messages])
+        
+    async def _send_encoded_batch(self, requests: List[Tuple[int, bytes]]) -> Dict[int, Dict[str, Any]]:
+        """Send encoded requests in one write and wait for all of their responses."""
+        futures = await self.send_encoded(requests)
+        
+        # Wait until every request has been answered (or the server goes away)
+        results = await asyncio.gather(*futures)
+        return {
+            request_id: response
+            for (request_id, _), response in zip(requests, results)
+            if response is not None
+        }
+        
+    def _from_template(self, template: bytes) -> Tuple[int, bytes]:
+        """Fill a pre-encoded request template with the next request ID."""
+        request_id = self.next_request_id()
+        return request_id, template % request_id
+        
+    def _request(self, method: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Build a JSON-RPC request with the next request ID."""
+        request = self._ENV.copy()
+        request["id"] = self.next_request_id()
+        request["method"] = method
+        if params is not None:
+            request["params"] = params
+        return request
+        
     async def initialize(self):
         """Initialize the MCP session."""
-        print(f"\n" + "="*60)
-        print("🔌 INITIALIZING MCP SESSION")
-        print("="*60)
+        _print_section(f"{ICONS['connect']}INITIALIZING MCP SESSION")
         
         # Send initialize request
-        init_request = {
-            "jsonrpc": "2.0",
-            "id": self.next_request_id(),
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {
-                    "tools": {},
-                    "resources": {},
-                    "prompts": {}
-                },
-                "clientInfo": {
-                    "name": "real-mcp-client",
-                    "version": "1.0.0"
-                }
-            }
-        }
-        
-        response = await self.send_message(init_request)
+        init_request = self._from_template(_TPL_INITIALIZE)
+        responses = await self._send_encoded_batch([init_request])
+        response = responses.get(init_request[0])
         
         if response and "result" in response:
-            print("✅ Server initialized successfully!")
             server_info = response["result"]
-            print(f"   Server name: {server_info.get('serverInfo', {}).get('name', 'Unknown')}")
-            print(f"   Protocol version: {server_info.get('protocolVersion', 'Unknown')}")
+            print("\n".join([
+                f"{ICONS['ok']}Server initialized successfully!",
+                f"   Server name: {server_info.get('serverInfo', {}).get('name', 'Unknown')}",
+                f"   Protocol version: {server_info.get('protocolVersion', 'Unknown')}",
+            ]))
             
             # Send initialized notification
-            initialized_notification = {
-                "jsonrpc": "2.0",
-                "method": "notifications/initialized"
-            }
-            
-            print(f"\n📤 SENDING: {json.dumps(initialized_notification)}")
-            self.process.stdin.write(json.dumps(initialized_notification).encode() + b'\n')
-            await self.process.stdin.drain()
+            if self.verbose:
+                logger.debug("\n%sSENDING: %s", ICONS["send"], _INITIALIZED_NOTIFICATION.decode())
+            self._send_q.put_nowait(_INITIALIZED_NOTIFICATION)
             
             return True
         else:
-            print("❌ Initialization failed!")
+            print(f"{ICONS['fail']}Initialization failed!")
             return False
             
     async def list_tools(self):
         """List available tools using MCP protocol."""
-        print(f"\n" + "="*60)
-        print("📋 LISTING TOOLS")
-        print("="*60)
-        
-        request = {
-            "jsonrpc": "2.0",
-            "id": self.next_request_id(),
-            "method": "tools/list"
-        }
+        _print_section(f"{ICONS['list']}LISTING TOOLS")
         
-        response = await self.send_message(request)
+        request_id, payload = self._from_template(_TPL_TOOLS_LIST)
+        responses = await self._send_encoded_batch([(request_id, payload)])
+        return self._report_tools(responses.get(request_id))
         
+    def _report_tools(self, response: Optional[Dict[str, Any]]):
+        """Print a tools/list response and return the tools."""
         if response and "result" in response:
             tools = response["result"].get("tools", [])
-            print(f"\n✅ Found {len(tools)} tools:")
-            for tool in tools:
-                print(f"   🔧 {tool['name']}: {tool.get('description', 'No description')}")
+            sys.stdout.write("".join(
+                [f"\n{ICONS['ok']}Found {len(tools)} tools:\n"]
+                + [f"   {ICONS['tool']}{tool['name']}: {tool.get('description', 'No description')}\n" for tool in tools]
+            ))
             return tools
         else:
-            print("❌ Failed to list tools")
+            print(f"{ICONS['fail']}Failed to list tools")
             return []
             
     async def call_tool(self, name: str, arguments: Dict[str, Any]):
         """Call a tool using MCP protocol."""
-        print(f"\n" + "="*60)
-        print(f"🔧 CALLING TOOL: {name}")
-        print("="*60)
-        
-        request = {
-            "jsonrpc": "2.0",
-            "id": self.next_request_id(),
-            "method": "tools/call",
-            "params": {
-                "name": name,
-                "arguments": arguments
-            }
-        }
+        _print_section(f"{ICONS['tool']}CALLING TOOL: {name}")
         
-        response = await self.send_message(request)
+        request = self._request("tools/call", {"name": name, "arguments": arguments})
+        responses = await self.send_batch([request])
+        return self._report_tool_call(arguments, responses.get(request["id"]))
         
+    def _report_tool_call(self, arguments: Dict[str, Any], response: Optional[Dict[str, Any]]):
+        """Print a tools/call response and return its result."""
         if response and "result" in response:
             result = response["result"]
-            print(f"\n✅ Tool call successful!")
-            print(f"   Arguments: {arguments}")
+            lines = [f"\n{ICONS['ok']}Tool call successful!", f"   Arguments: {arguments}"]
             
-            # Print content from the response
+            # Collect content from the response
             content = result.get("content", [])
             for item in content:
                 if item.get("type") == "text":
-                    print(f"   Result: {item.get('text')}")
+                    lines.append(f"   Result: {item.get('text')}")
                     
+            print("\n".join(lines))
             return result
         else:
-            print("❌ Tool call failed")
+            print(f"{ICONS['fail']}Tool call failed")
             if response and "error" in response:
                 print(f"   Error: {response['error']}")
             return None
             
     async def list_resources(self):
         """List available resources using MCP protocol."""
-        print(f"\n" + "="*60)
-        print("📚 LISTING RESOURCES")
-        print("="*60)
-        
-        request = {
-            "jsonrpc": "2.0",
-            "id": self.next_request_id(),
-            "method": "resources/list"
-        }
+        _print_section(f"{ICONS['resources']}LISTING RESOURCES")
         
-        response = await self.send_message(request)
+        request_id, payload = self._from_template(_TPL_RESOURCES_LIST)
+        responses = await self._send_encoded_batch([(request_id, payload)])
+        return self._report_resources(responses.get(request_id))
         
+    def _report_resources(self, response: Optional[Dict[str, Any]]):
+        """Print a resources/list response and return the resources."""
         if response and "result" in response:
             resources = response["result"].get("resources", [])
-            print(f"\n✅ Found {len(resources)} resources:")
-            for resource in resources:
-                print(f"   📄 {resource['uri']}: {resource.get('description', 'No description')}")
+            sys.stdout.write("".join(
+                [f"\n{ICONS['ok']}Found {len(resources)} resources:\n"]
+                + [f"   {ICONS['resource']}{resource['uri']}: {resource.get('description', 'No description')}\n" for resource in resources]
+            ))
             return resources
         else:
-            print("❌ Failed to list resources")
+            print(f"{ICONS['fail']}Failed to list resources")
             return []
             
     async def read_resource(self, uri: str):
-        """Read a resource using MCP protocol."""
-        print(f"\n" + "="*60)
-        print(f"📄 READING RESOURCE: {uri}")
-        print("="*60)
-        
-        request = {
-            "jsonrpc": "2.0",
-            "id": self.next_request_id(),
-            "method": "resources/read",
-            "params": {
-                "uri": uri
-            }
-        }
-        
+        """Read a resource using MCP protocol.
+
+        The section header is printed together with the result, so several
+        reads can be in flight at once without interleaving their output.
+        """
+        request = self._request("resources/read", {"uri": uri})
         response = await self.send_message(request)
         
+        _print_section(f"{ICONS['resource']}READING RESOURCE: {uri}")
+        return self._report_resource(response)
+        
+    def _report_resource(self, response: Optional[Dict[str, Any]]):
+        """Print a resources/read response and return its result."""
         if response and "result" in response:
             result = response["result"]
-            print(f"\n✅ Resource read successful!")
+            lines = [f"\n{ICONS['ok']}Resource read successful!"]
             
-            # Print contents from the response
+            # Collect contents from the response
             contents = result.get("contents", [])
             for item in contents:
                 if item.get("type") == "text":
-                    print(f"   Content: {item.get('text')}")
+                    lines.append(f"   Content: {item.get('text')}")
                     
+            print("\n".join(lines))
             return result
         else:
-            print("❌ Resource read failed")
+            print(f"{ICONS['fail']}Resource read failed")
             if response and "error" in response:
                 print(f"   Error: {response['error']}")
             return None
             
     async def list_prompts(self):
         """List available prompts using MCP protocol."""
-        print(f"\n" + "="*60)
-        print("💭 LISTING PROMPTS")
-        print("="*60)
-        
-        request = {
-            "jsonrpc": "2.0",
-            "id": self.next_request_id(),
-            "method": "prompts/list"
-        }
+        _print_section(f"{ICONS['prompts']}LISTING PROMPTS")
         
-        response = await self.send_message(request)
+        request_id, payload = self._from_template(_TPL_PROMPTS_LIST)
+        responses = await self._send_encoded_batch([(request_id, payload)])
+        return self._report_prompts(responses.get(request_id))
         
+    def _report_prompts(self, response: Optional[Dict[str, Any]]):
+        """Print a prompts/list response and return the prompts."""
         if response and "result" in response:
             prompts = response["result"].get("prompts", [])
-            print(f"\n✅ Found {len(prompts)} prompts:")
-            for prompt in prompts:
-                print(f"   ✨ {prompt['name']}: {prompt.get('description', 'No description')}")
+            sys.stdout.write("".join(
+                [f"\n{ICONS['ok']}Found {len(prompts)} prompts:\n"]
+                + [f"   {ICONS['prompt']}{prompt['name']}: {prompt.get('description', 'No description')}\n" for prompt in prompts]
+            ))
             return prompts
         else:
-            print("❌ Failed to list prompts")
+            print(f"{ICONS['fail']}Failed to list prompts")
             return []
             
     async def get_prompt(self, name: str, arguments: Dict[str, Any]):
         """Get a prompt using MCP protocol."""
-        print(f"\n" + "="*60)
-        print(f"✨ GETTING PROMPT: {name}")
-        print("="*60)
-        
-        request = {
-            "jsonrpc": "2.0",
-            "id": self.next_request_id(),
-            "method": "prompts/get",
-            "params": {
-                "name": name,
-                "arguments": arguments
-            }
-        }
+        _print_section(f"{ICONS['prompt']}GETTING PROMPT: {name}")
         
+        request = self._request("prompts/get", {"name": name, "arguments": arguments})
         response = await self.send_message(request)
+        return self._report_prompt(arguments, response)
         
+    def _report_prompt(self, arguments: Dict[str, Any], response: Optional[Dict[str, Any]]):
+        """Print a prompts/get response and return its result."""
         if response and "result" in response:
             result = response["result"]
-            print(f"\n✅ Prompt generation successful!")
-            print(f"   Arguments: {arguments}")
+            lines = [f"\n{ICONS['ok']}Prompt generation successful!", f"   Arguments: {arguments}"]
             
-            # Print messages from the response
+            # Collect messages from the response
             messages = result.get("messages", [])
             for message in messages:
                 if message.get("role") == "user":
                     content = message.get("content")
                     if isinstance(content, dict) and content.get("type") == "text":
-                        print(f"   Generated Prompt: {content.get('text')}")
+                        lines.append(f"   Generated Prompt: {content.get('text')}")
                     elif isinstance(content, str):
-                        print(f"   Generated Prompt: {content}")
+                        lines.append(f"   Generated Prompt: {content}")
                         
+            print("\n".join(lines))
             return result
         else:
-            print("❌ Prompt generation failed")
+            print(f"{ICONS['fail']}Prompt generation failed")
             if response and "error" in response:
                 print(f"   Error: {response['error']}")
             return None
             
     async def run_comprehensive_test(self):
-        """Run comprehensive test of all MCP protocol features."""
+        """Run comprehensive test of all MCP protocol features on an initialized session."""
         try:
-            await self.start_server()
+            # List all capabilities in one batch
+            _print_section(f"{ICONS['list']}LISTING CAPABILITIES")
+            tools_req = self._from_template(_TPL_TOOLS_LIST)
+            resources_req = self._from_template(_TPL_RESOURCES_LIST)
+            prompts_req = self._from_template(_TPL_PROMPTS_LIST)
+            responses = await self._send_encoded_batch([tools_req, resources_req, prompts_req])
             
-            # Initialize session
-            if not await self.initialize():
-                return
-                
-            # List all capabilities
-            tools = await self.list_tools()
-            resources = await self.list_resources()
-            prompts = await self.list_prompts()
+            _print_section(f"{ICONS['list']}LISTING TOOLS")
+            tools = self._report_tools(responses.get(tools_req[0]))
+            _print_section(f"{ICONS['resources']}LISTING RESOURCES")
+            resources = self._report_resources(responses.get(resources_req[0]))
+            _print_section(f"{ICONS['prompts']}LISTING PROMPTS")
+            prompts = self._report_prompts(responses.get(prompts_req[0]))
             
-            print(f"\n" + "="*60)
-            print("🧪 TESTING PROTOCOL COMMUNICATION")
-            print("="*60)
+            _print_section(f"{ICONS['test']}TESTING PROTOCOL COMMUNICATION")
+            
+            # Tool calls, resource reads and prompt requests are all
+            # independent: send them together and report in order afterwards
+            calls = [
+                (name, arguments, self._request("tools/call", {"name": name, "arguments": arguments}))
+                for name, arguments in (TEST_TOOL_CALLS if tools else ())
+            ]
+            reads = [
+                (resource["uri"], self._request("resources/read", {"uri": resource["uri"]}))
+                for resource in resources
+            ]
+            prompt_gets = [
+                (name, arguments, self._request("prompts/get", {"name": name, "arguments": arguments}))
+                for name, arguments in (TEST_PROMPTS if prompts else ())
+            ]
+            responses = await self.send_batch(
+                [request for _, _, request in calls]
+                + [request for _, request in reads]
+                + [request for _, _, request in prompt_gets]
+            )
             
             # Test tools
             if tools:
-                print(f"\n🔧 TESTING TOOLS ({len(tools)} available)")
-                
-                # Test calculator tool
-                await self.call_tool("calculate", {
-                    "operation": "add",
-                    "a": 25,
-                    "b": 17
-                })
-                
-                # Test text transform
-                await self.call_tool("text_transform", {
-                    "text": "MCP Protocol Test",
-                    "transformation": "upper"
-                })
+                print(f"\n{ICONS['tool']}TESTING TOOLS ({len(tools)} available)")
                 
-                # Test counter
-                await self.call_tool("manage_counter", {
-                    "action": "increment",
-                    "amount": 10
-                })
+                for name, arguments, request in calls:
+                    _print_section(f"{ICONS['tool']}CALLING TOOL: {name}")
+                    self._report_tool_call(arguments, responses.get(request["id"]))
             
             # Test resources
             if resources:
-                print(f"\n📚 TESTING RESOURCES ({len(resources)} available)")
+                print(f"\n{ICONS['resources']}TESTING RESOURCES ({len(resources)} available)")
                 
-                for resource in resources:
-                    await self.read_resource(resource["uri"])
+                for uri, request in reads:
+                    _print_section(f"{ICONS['resource']}READING RESOURCE: {uri}")
+                    self._report_resource(responses.get(request["id"]))
             
             # Test prompts
             if prompts:
-                print(f"\n💭 TESTING PROMPTS ({len(prompts)} available)")
+                print(f"\n{ICONS['prompts']}TESTING PROMPTS ({len(prompts)} available)")
                 
-                # Test code generation prompt
-                await self.get_prompt("generate_code", {
-                    "language": "javascript", 
-                    "task": "create a function to validate email addresses",
-                    "style": "simple"
-                })
+                for name, arguments, request in prompt_gets:
+                    _print_section(f"{ICONS['prompt']}GETTING PROMPT: {name}")
+                    self._report_prompt(arguments, responses.get(request["id"]))
                 
-            print(f"\n" + "="*60)
-            print("🎉 ALL PROTOCOL TESTS COMPLETED!")
-            print("   • JSON-RPC communication: ✅ Working")
-            print("   • Tool calling: ✅ Working")
-            print("   • Resource reading: ✅ Working")
-            print("   • Prompt generation: ✅ Working")
-            print("="*60)
+            _print_section("\n".join([
+                f"{ICONS['done']}ALL PROTOCOL TESTS COMPLETED!",
+                f"   • JSON-RPC communication: {ICONS['ok']}Working",
+                f"   • Tool calling: {ICONS['ok']}Working",
+                f"   • Resource reading: {ICONS['ok']}Working",
+                f"   • Prompt generation: {ICONS['ok']}Working",
+            ]))
             
         except Exception as e:
-            print(f"❌ Error during protocol test: {e}")
+            print(f"{ICONS['fail']}Error during protocol test: {e}")
             import traceback
             traceback.print_exc()
-        finally:
-            await self.cleanup()
             
     async def cleanup(self):
         """Clean up the server process."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except (asyncio.CancelledError, Exception):
+                # The writer may already have died, e.g. on a closed pipe
+                pass
+            self._flush_task = None
+            
+        if self._reader_task:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._reader_task = None
+            
         if self.process:
-            print(f"\n🔄 Cleaning up server process...")
-            self.process.terminate()
+            print(f"\n{ICONS['cleanup']}Cleaning up server process...")
+            if self.process.returncode is None:
+                self.process.terminate()
             await self.process.wait()
-            print("✅ Server process cleaned up")
+            self.process = None
+            print(f"{ICONS['ok']}Server process cleaned up")
+
+
+# Live, initialized clients keyed by server script path (see RealMCPClient.acquire)
+_SERVER_POOL: Dict[str, RealMCPClient] = {}
+_POOL_LOCK = asyncio.Lock()
+
+
+async def close_server_pool():
+    """Terminate every pooled server process."""
+    async with _POOL_LOCK:
+        clients = list(_SERVER_POOL.values())
+        _SERVER_POOL.clear()
+    for client in clients:
+        await client.cleanup()
+
 
+@functools.cache
+def _server_path() -> str:
+    """Absolute path of the demo server script, resolved once."""
+    return str((Path(__file__).parent.parent / "server" / "demo_server.py").resolve())
 
-async def main():
+
+async def main(mode: str = "full"):
     """Main function."""
-    print("🚀 Real MCP Protocol Client")
-    print("=" * 60)
-    print("This shows actual JSON-RPC communication with the MCP server")
-    print("=" * 60)
+    print("\n".join([
+        f"{ICONS['start']}Real MCP Protocol Client",
+        _SEP,
+        "This shows actual JSON-RPC communication with the MCP server",
+        _SEP,
+    ]))
     
     # Get server path
-    server_path = os.path.join(os.path.dirname(__file__), "..", "server", "demo_server.py")
-    server_path = os.path.abspath(server_path)
+    server_path = _server_path()
+    
+    print(f"{ICONS['location']}Server script: {server_path}")
     
-    print(f"📍 Server script: {server_path}")
+    # Show the raw protocol messages in line with the rest of the output
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
     
-    # Create and run client
-    client = RealMCPClient(server_path)
-    await client.run_comprehensive_test()
+    # Check out a client (starting the server on first use) and run the tests
+    try:
+        async with RealMCPClient.acquire(server_path, verbose=True) as client:
+            if mode == "connect":
+                print(f"\n{ICONS['ok']}Connection check passed")
+            else:
+                await client.run_comprehensive_test()
+    except RuntimeError as e:
+        print(f"{ICONS['fail']}{e}")
+    finally:
+        await close_server_pool()
+
+
+def _parse_args() -> argparse.Namespace:
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Exercise the demo MCP server over JSON-RPC.")
+    parser.add_argument(
+        "--mode",
+        choices=("connect", "full"),
+        default="full",
+        help="connect: start the server and complete the handshake only; "
+             "full: also list and exercise every tool, resource and prompt (default)",
+    )
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    args = _parse_args()
+    
+    # uvloop speeds up the stdio I/O loop; fall back to asyncio's default
+    # loop where it is not available (e.g. Windows)
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main(args.mode))
+    else:
+        uvloop.run(main(args.mode))
\ No newline at end of file
@@ -4,59 +4,75 @@ Quick Demo Runner
 Simple script to test the MCP server directly.
 """
 
-import subprocess
-import sys
+import asyncio
 import os
+import sys
+
+# Banner rules used by the output below
+_SEP = "=" * 50
+_SUBSEP = "-" * 50
+
+# Closing usage notes, joined once and written in one go
+_HELP_TEXT = "\n".join([
+    "\n🎯 How to use:",
+    "1. Install MCP: pip install 'mcp[cli]'",
+    "2. Test server: mcp dev server/demo_server.py",
+    "3. Use with Claude Desktop or other MCP clients",
+    "4. Run client test: python client/real_mcp_client.py",
+]) + "\n"
+
+async def _list_features(server):
+    """Connect an in-memory MCP client to the server and list its features.
+
+    The client goes through the real initialize handshake and JSON-RPC
+    requests, just without a subprocess or stdio pipes in between.
+    """
+    # Imported here so a missing mcp package is reported like any other load error
+    from mcp.shared.memory import create_connected_server_and_client_session
+
+    async with create_connected_server_and_client_session(server) as session:
+        tools, resources, prompts = await asyncio.gather(
+            session.list_tools(), session.list_resources(), session.list_prompts()
+        )
+    return tools.tools, resources.resources, prompts.prompts
+
+def _summary(description):
+    """First line of a feature description."""
+    return description.strip().splitlines()[0] if description else ""
 
 def run_server_test():
-    """Run the server in test mode to show available features."""
+    """Load the server and show its available features."""
     print("🚀 MCP Practical Demo")
-    print("=" * 50)
+    print(_SEP)
     
     server_path = os.path.join("server", "demo_server.py")
     
     print(f"Testing server: {server_path}")
-    print("\nStarting server (this will show available features)...")
-    print("-" * 50)
+    print("\nLoading server (this will show available features)...")
+    print(_SUBSEP)
     
     try:
-        # Run the server directly to see its startup message
-        result = subprocess.run([
-            sys.executable, server_path
-        ], capture_output=True, text=True, timeout=2)
-        
-        print("Server startup output:")
-        print(result.stdout)
-        if result.stderr:
-            print("Errors:")
-            print(result.stderr)
-            
-    except subprocess.TimeoutExpired:
-        print("✅ Server started successfully (timed out after 2 seconds as expected)")
-        print("The server is designed to run continuously and communicate over stdio.")
+        # Import the server module and talk to it in-process instead of
+        # starting a separate Python process just to read its banner
+        from server.demo_server import mcp
+        tools, resources, prompts = asyncio.run(_list_features(mcp))
     except Exception as e:
-        print(f"❌ Error running server: {e}")
-    
-    print("\n" + "=" * 50)
-    print("🔧 Available Tools:")
-    print("  • calculate - Perform arithmetic operations")
-    print("  • text_transform - Transform text (upper, lower, reverse, etc.)")
-    print("  • manage_counter - Increment/decrement/reset a counter")
-    print("  • file_info - Get file information")
-    
-    print("\n📚 Available Resources:")
-    print("  • status://server - Server status and statistics")
-    print("  • data://users - Demo user data")
-    
-    print("\n💭 Available Prompts:")
-    print("  • generate_code - Generate code snippets")
-    print("  • email_template - Generate email templates")
+        print(f"❌ Error loading server: {e}")
+    else:
+        print(f"✅ Server loaded and completed the MCP handshake: {mcp.name}")
+        print("The server is designed to run continuously and communicate over stdio.")
+        
+        print("\n" + _SEP)
+        print("\n".join(
+            ["🔧 Available Tools:"]
+            + [f"  • {tool.name} - {_summary(tool.description)}" for tool in tools]
+            + ["\n📚 Available Resources:"]
+            + [f"  • {resource.uri} - {_summary(resource.description)}" for resource in resources]
+            + ["\n💭 Available Prompts:"]
+            + [f"  • {prompt.name} - {_summary(prompt.description)}" for prompt in prompts]
+        ))
     
-    print("\n🎯 How to use:")
-    print("1. Install MCP: pip install 'mcp[cli]'")
-    print("2. Test server: mcp dev server/demo_server.py")
-    print("3. Use with Claude Desktop or other MCP clients")
-    print("4. Run client test: python client/test_client.py")
+    sys.stdout.write(_HELP_TEXT)
 
 if __name__ == "__main__":
     run_server_test()
\ No newline at end of file
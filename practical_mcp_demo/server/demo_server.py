@@ -5,25 +5,126 @@ A practical example showing how MCP servers work with various tools and resource
 """
 
 from mcp.server.fastmcp import FastMCP
+import asyncio
+import functools
 import json
+import operator
 import os
-import datetime
+import re
+import stat
+import sys
+import time
+from dataclasses import dataclass, field
+
+try:
+    import orjson
+except ImportError:
+    # Responses are parsed by clients, not read by people, so both
+    # encoders emit compact JSON.
+    def _dumps(obj) -> str:
+        return json.dumps(obj, separators=(",", ":"))
+else:
+    def _dumps(obj) -> str:
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:
+            # orjson rejects integers beyond 64 bits (e.g. a huge counter);
+            # the stdlib encoder has no such limit
+            return json.dumps(obj, separators=(",", ":"))
 
 # Create the MCP server
 mcp = FastMCP("Practical Demo Server")
 
-# Simple data store for demonstration
-demo_data = {
-    "users": [
+# Local ISO 8601 timestamps, formatted straight from the epoch with time.strftime
+_ISO_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+def _default_users() -> list[dict]:
+    """Demo user records, kept as dicts so both JSON encoders accept them."""
+    return [
         {"id": 1, "name": "Alice", "email": "alice@example.com"},
         {"id": 2, "name": "Bob", "email": "bob@example.com"}
-    ],
-    "counter": 0
+    ]
+
+@dataclass(slots=True)
+class DemoState:
+    """Simple data store for demonstration, with slots instead of dict lookups."""
+    counter: int = 0
+    users: list[dict] = field(default_factory=_default_users)
+
+state = DemoState()
+
+# Serializes counter updates between concurrent tool calls
+_counter_lock = asyncio.Lock()
+
+# (epoch second, ISO string) of the last status timestamp
+_last_ts = (-1, "")
+
+def _now_iso() -> str:
+    """Current local time as an ISO string, formatted at most once per second."""
+    global _last_ts
+    now = int(time.time())
+    last_epoch, last_iso = _last_ts
+    if now != last_epoch:
+        last_iso = time.strftime(_ISO_FORMAT, time.localtime(now))
+        _last_ts = (now, last_iso)
+    return last_iso
+
+# The user list never changes, so serialize it once rather than per request
+_USERS_JSON = _dumps(state.users)
+
+# Parts of the server status that are the same on every request
+_STATUS_STATIC = {
+    "tools_available": ["calculate", "text_transform", "manage_counter", "file_info", "file_info_batch"],
+    "resources_available": ["status://server", "data://users"],
+    "uptime": "N/A (demo)"
+}
+
+def _safe_div(x: float, y: float) -> float:
+    """Divide, returning infinity instead of raising on a zero divisor."""
+    return x / y if y != 0 else float('inf')
+
+def _reverse(text: str) -> str:
+    """Reverse a string."""
+    return text[::-1]
+
+_WORD_RE = re.compile(r"\S+")
+
+def _count_words(text: str) -> str:
+    """Count whitespace-separated words, as a string, without building a word list."""
+    return str(sum(1 for _ in _WORD_RE.finditer(text)))
+
+# Dispatch tables for calculate() and text_transform(), built once. The
+# literal keys are interned by the compiler; the tools intern incoming names.
+_CALC_OPS = {
+    "add": operator.add,
+    "subtract": operator.sub,
+    "multiply": operator.mul,
+    "divide": _safe_div
 }
 
+_TEXT_OPS = {
+    "upper": str.upper,
+    "lower": str.lower,
+    "reverse": _reverse,
+    "count_words": _count_words,
+    "title": str.title
+}
+
+def _apply_transform(text: str, transformation: str) -> str:
+    """Apply a text transformation."""
+    transform = _TEXT_OPS.get(transformation)
+    if transform is None:
+        raise ValueError(f"Unknown transformation: {transformation}")
+    
+    return transform(text)
+
+# Only short texts are memoised, so the cache can't pin large client payloads
+_MEMO_MAX_LEN = 256
+_apply_transform_cached = functools.lru_cache(maxsize=1024)(_apply_transform)
+
 # Tool 1: Calculator functions
 @mcp.tool()
-def calculate(operation: str, a: float, b: float) -> float:
+async def calculate(operation: str, a: float, b: float) -> float:
     """Perform basic arithmetic operations.
     
     Args:
@@ -34,21 +135,23 @@ def calculate(operation: str, a: float, b: float) -> float:
     Returns:
         The result of the calculation
     """
-    operations = {
-        "add": lambda x, y: x + y,
-        "subtract": lambda x, y: x - y,
-        "multiply": lambda x, y: x * y,
-        "divide": lambda x, y: x / y if y != 0 else float('inf')
-    }
+    operation = sys.intern(operation)
+    # The common operations skip the dispatch table and its call
+    if operation == "add":
+        return a + b
+    if operation == "multiply":
+        return a * b
     
-    if operation not in operations:
+    # Interned keys let the dict lookup match on identity
+    op = _CALC_OPS.get(operation)
+    if op is None:
         raise ValueError(f"Unknown operation: {operation}")
     
-    return operations[operation](a, b)
+    return op(a, b)
 
 # Tool 2: Text utilities
 @mcp.tool()
-def text_transform(text: str, transformation: str) -> str:
+async def text_transform(text: str, transformation: str) -> str:
     """Transform text in various ways.
     
     Args:
@@ -58,22 +161,14 @@ def text_transform(text: str, transformation: str) -> str:
     Returns:
         The transformed text or count
     """
-    transformations = {
-        "upper": lambda t: t.upper(),
-        "lower": lambda t: t.lower(),
-        "reverse": lambda t: t[::-1],
-        "count_words": lambda t: str(len(t.split())),
-        "title": lambda t: t.title()
-    }
-    
-    if transformation not in transformations:
-        raise ValueError(f"Unknown transformation: {transformation}")
-    
-    return transformations[transformation](text)
+    transformation = sys.intern(transformation)
+    if len(text) <= _MEMO_MAX_LEN:
+        return _apply_transform_cached(text, transformation)
+    return _apply_transform(text, transformation)
 
 # Tool 3: Counter management
 @mcp.tool()
-def manage_counter(action: str, amount: int = 1) -> int:
+async def manage_counter(action: str, amount: int = 1) -> int:
     """Manage a simple counter.
     
     Args:
@@ -83,24 +178,62 @@ def manage_counter(action: str, amount: int = 1) -> int:
     Returns:
         Current counter value
     """
-    global demo_data
-    
-    if action == "increment":
-        demo_data["counter"] += amount
-    elif action == "decrement":
-        demo_data["counter"] -= amount
-    elif action == "reset":
-        demo_data["counter"] = 0
-    elif action == "get":
-        pass  # Just return current value
-    else:
-        raise ValueError(f"Unknown action: {action}")
+    action = sys.intern(action)
+    if action == "get":
+        # Reading an int attribute is atomic, so reads skip the lock
+        return state.counter
     
-    return demo_data["counter"]
+    async with _counter_lock:
+        if action == "increment":
+            state.counter += amount
+        elif action == "decrement":
+            state.counter -= amount
+        elif action == "reset":
+            state.counter = 0
+        else:
+            raise ValueError(f"Unknown action: {action}")
+        
+        return state.counter
+
+def _info_from_stat(mtime: float, size: int, mode: int) -> dict:
+    """file_info fields for a stat result; the type comes from st_mode, not extra stats."""
+    return {
+        "exists": True,
+        "size_bytes": size,
+        "modified_time": time.strftime(_ISO_FORMAT, time.localtime(mtime)),
+        "is_directory": stat.S_ISDIR(mode),
+        "is_file": stat.S_ISREG(mode)
+    }
+
+@functools.lru_cache(maxsize=256)
+def _file_info_json(mtime: float, size: int, mode: int) -> str:
+    """Serialized file_info for a stat result.
+
+    The reply depends only on these stat fields, so they alone are the cache
+    key: a modified file misses, and identical stats share one entry.
+    """
+    return _dumps(_info_from_stat(mtime, size, mode))
+
+# Missing paths are the common miss when probing for files, so their reply is fixed
+_NOT_FOUND_JSON = _dumps({"exists": False})
+
+def _stat_info(file_path: str) -> dict:
+    """file_info fields for a single path."""
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        return {"exists": False}
+    except Exception as e:
+        return {"error": str(e)}
+    return _info_from_stat(st.st_mtime, st.st_size, st.st_mode)
+
+def _stat_infos(file_paths: list) -> dict:
+    """file_info fields for many paths, stat'ed exactly as file_info would."""
+    return {file_path: _stat_info(file_path) for file_path in file_paths}
 
 # Tool 4: File operations
 @mcp.tool()
-def file_info(file_path: str) -> str:
+async def file_info(file_path: str) -> str:
     """Get information about a file.
     
     Args:
@@ -110,20 +243,29 @@ def file_info(file_path: str) -> str:
         JSON string with file information
     """
     try:
-        stat = os.stat(file_path)
-        info = {
-            "exists": True,
-            "size_bytes": stat.st_size,
-            "modified_time": datetime.datetime.fromtimestamp(stat.st_mtime).isoformat(),
-            "is_directory": os.path.isdir(file_path),
-            "is_file": os.path.isfile(file_path)
-        }
+        # Stat in a worker thread so slow disks don't stall the event loop
+        st = await asyncio.to_thread(os.stat, file_path)
     except FileNotFoundError:
-        info = {"exists": False}
+        return _NOT_FOUND_JSON
     except Exception as e:
-        info = {"error": str(e)}
+        return _dumps({"error": str(e)})
     
-    return json.dumps(info, indent=2)
+    return _file_info_json(st.st_mtime, st.st_size, st.st_mode)
+
+# Tool 5: Batched file operations
+@mcp.tool()
+async def file_info_batch(file_paths: list[str]) -> str:
+    """Get information about several files at once.
+    
+    Args:
+        file_paths: Paths to the files
+    
+    Returns:
+        JSON object mapping each path to its file information
+    """
+    # One worker thread for the whole batch so slow disks don't stall the event loop
+    results = await asyncio.to_thread(_stat_infos, file_paths)
+    return _dumps(results)
 
 # Resource 1: Server status
 @mcp.resource("status://server")
@@ -131,19 +273,58 @@ def server_status() -> str:
     """Return current server status and statistics."""
     status = {
         "status": "running",
-        "timestamp": datetime.datetime.now().isoformat(),
-        "demo_data": demo_data,
-        "tools_available": ["calculate", "text_transform", "manage_counter", "file_info"],
-        "resources_available": ["status://server", "data://users"],
-        "uptime": "N/A (demo)"
+        "timestamp": _now_iso(),
+        "demo_data": {"users": state.users, "counter": state.counter},
+        **_STATUS_STATIC
     }
-    return json.dumps(status, indent=2)
+    return _dumps(status)
 
 # Resource 2: User data
 @mcp.resource("data://users")
 def get_users() -> str:
     """Return the list of demo users."""
-    return json.dumps(demo_data["users"], indent=2)
+    return _USERS_JSON
+
+# Prompt scaffolds, filled in with str.format_map
+_CODE_STYLES = {
+    "simple": "Write simple, clean code",
+    "advanced": "Write advanced, optimized code with best practices",
+    "commented": "Write well-commented code with explanations"
+}
+
+_CODE_TEMPLATE = """Please write a {language} code snippet that {task}.
+
+Requirements:
+- {style_instruction}
+- Follow {language} conventions
+- Include error handling where appropriate
+- Make it production-ready
+
+Task: {task}"""
+
+_EMAIL_INSTRUCTIONS = {
+    "welcome": "Create a warm welcome email",
+    "reminder": "Write a polite reminder email",
+    "thank_you": "Compose a sincere thank you email",
+    "support": "Draft a helpful support response email"
+}
+
+_EMAIL_HEADER = """{template_instruction} for {recipient_name}.
+
+Email type: {type}
+Recipient: {recipient_name}"""
+
+_EMAIL_FOOTER = """
+
+Please write a professional email that is:
+- Appropriate for the context
+- Clear and concise
+- Properly formatted
+- Engaging and helpful"""
+
+# One variant with a context line and one without, so no concatenation per call
+_EMAIL_TEMPLATE = _EMAIL_HEADER + _EMAIL_FOOTER
+_EMAIL_TEMPLATE_WITH_CONTEXT = _EMAIL_HEADER + "\nContext: {context}" + _EMAIL_FOOTER
 
 # Prompt 1: Code generator
 @mcp.prompt()
@@ -155,23 +336,13 @@ def generate_code(language: str, task: str, style: str = "simple") -> str:
         task: What the code should do
         style: Code style preference (simple, advanced, commented)
     """
-    styles = {
-        "simple": "Write simple, clean code",
-        "advanced": "Write advanced, optimized code with best practices",
-        "commented": "Write well-commented code with explanations"
-    }
+    style_instruction = _CODE_STYLES.get(style, _CODE_STYLES["simple"])
     
-    style_instruction = styles.get(style, styles["simple"])
-    
-    return f"""Please write a {language} code snippet that {task}.
-
-Requirements:
-- {style_instruction}
-- Follow {language} conventions
-- Include error handling where appropriate
-- Make it production-ready
-
-Task: {task}"""
+    return _CODE_TEMPLATE.format_map({
+        "language": language,
+        "task": task,
+        "style_instruction": style_instruction
+    })
 
 # Prompt 2: Email template
 @mcp.prompt()
@@ -183,37 +354,23 @@ def email_template(type: str, recipient_name: str, context: str = "") -> str:
         recipient_name: Name of the recipient
         context: Additional context for the email
     """
-    templates = {
-        "welcome": "Create a warm welcome email",
-        "reminder": "Write a polite reminder email",
-        "thank_you": "Compose a sincere thank you email",
-        "support": "Draft a helpful support response email"
-    }
-    
-    template_instruction = templates.get(type, "Write a professional email")
-    
-    prompt = f"""{template_instruction} for {recipient_name}.
-
-Email type: {type}
-Recipient: {recipient_name}"""
-    
-    if context:
-        prompt += f"\nContext: {context}"
-    
-    prompt += """
-
-Please write a professional email that is:
-- Appropriate for the context
-- Clear and concise
-- Properly formatted
-- Engaging and helpful"""
+    template_instruction = _EMAIL_INSTRUCTIONS.get(type, "Write a professional email")
     
-    return prompt
+    template = _EMAIL_TEMPLATE_WITH_CONTEXT if context else _EMAIL_TEMPLATE
+    return template.format_map({
+        "template_instruction": template_instruction,
+        "recipient_name": recipient_name,
+        "type": type,
+        "context": context
+    })
 
 if __name__ == "__main__":
-    print("Starting Practical MCP Demo Server...")
-    print("Available tools: calculate, text_transform, manage_counter, file_info")
-    print("Available resources: status://server, data://users")
-    print("Available prompts: generate_code, email_template")
-    print("\nServer running on stdio...")
+    # stdout carries the JSON-RPC stream, so the banner goes to stderr
+    print("\n".join([
+        "Starting Practical MCP Demo Server...",
+        "Available tools: calculate, text_transform, manage_counter, file_info, file_info_batch",
+        "Available resources: status://server, data://users",
+        "Available prompts: generate_code, email_template",
+        "\nServer running on stdio...",
+    ]), file=sys.stderr)
     mcp.run()
\ No newline at end of file